@@ -0,0 +1,29 @@
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine
+from config import settings
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# Tables are still created by Base.metadata.create_all on startup,
+# migrations only bring existing databases up to date with the models.
+target_metadata = None
+
+def run_migrations_offline():
+    context.configure(url=settings.DATABASE_URL, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    connectable = create_engine(settings.DATABASE_URL)
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
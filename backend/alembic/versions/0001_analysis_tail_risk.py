@@ -0,0 +1,23 @@
+"""Add Monte Carlo VaR / CVaR columns to analyses
+
+Revision ID: 0001_analysis_tail_risk
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '0001_analysis_tail_risk'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# IF [NOT] EXISTS: on a fresh database create_all may run before or after this migration
+COLUMNS = ('var_95', 'cvar_95', 'var_99', 'cvar_99')
+
+def upgrade():
+    for column in COLUMNS:
+        op.execute(f"ALTER TABLE IF EXISTS analyses ADD COLUMN IF NOT EXISTS {column} DOUBLE PRECISION")
+
+def downgrade():
+    for column in COLUMNS:
+        op.execute(f"ALTER TABLE IF EXISTS analyses DROP COLUMN IF EXISTS {column}")
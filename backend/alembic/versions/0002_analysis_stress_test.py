@@ -0,0 +1,18 @@
+"""Add historical stress test results to analyses
+
+Revision ID: 0002_analysis_stress_test
+Revises: 0001_analysis_tail_risk
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '0002_analysis_stress_test'
+down_revision = '0001_analysis_tail_risk'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("ALTER TABLE IF EXISTS analyses ADD COLUMN IF NOT EXISTS stress_test JSONB")
+
+def downgrade():
+    op.execute("ALTER TABLE IF EXISTS analyses DROP COLUMN IF EXISTS stress_test")
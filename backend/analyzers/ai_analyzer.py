@@ -1,69 +1,162 @@
 from openai import OpenAI
 from ..config import settings
 import json
+from functools import lru_cache
+import numpy as np
 from ..models import Portfolio
+from .portfolio_frame import PortfolioFrame
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+RESPONSE_FORMAT = """{
+  "summary": "종합 평가 (한글 3-4문장)",
+  "strengths": ["강점1", "강점2", "강점3"],
+  "weaknesses": ["약점1", "약점2", "약점3"],%s
+  "risk_assessment": "리스크 평가",
+  "long_term_strategy": "장기 전략"
+}"""
+ACTIONS_FORMAT = """
+  "immediate_actions": [{"action": "sell", "ticker": "TICKER", "quantity": 10, "reason": "이유"}],"""
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """
+    Loaded on first use, get_encoding downloads the BPE file the first time it runs.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # BPE file can't be downloaded, fall back to the estimate
+        return None
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # Rough estimate: Hangul is ~1 token per character, ascii ~4 characters per token
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return (len(text) - ascii_chars) + ascii_chars // 4 + 1
+
+def _format_holdings(frame: PortfolioFrame, top_n: int) -> str:
+    weight = frame.weight
+    ranked = np.argsort(-weight, kind="stable")
+    lines = [f"{frame.ticker[i]} {frame.name[i]} {int(frame.quantity[i])}주 {weight[i]:.1f}%" for i in ranked[:top_n]]
+    tail = ranked[top_n:]
+    if len(tail):
+        lines.append(f"기타 {len(tail)}종목 합계 {weight[tail].sum():.1f}%")
+    return "\n".join(lines)
+
+def _format_sectors(sector_analysis: dict) -> str:
+    current = sorted(sector_analysis['current'].items(), key=lambda kv: kv[1], reverse=True)
+    return ", ".join(f"{s} {w * 100:.0f}%" for s, w in current)
+
+def _format_issues(sector_analysis: dict) -> str:
+    if not sector_analysis['issues']:
+        return "없음"
+    return ", ".join(
+        f"{i['sector']} {i['current'] * 100:.0f}%→{i['recommended'] * 100:.0f}% {'축소' if i['action'] == 'reduce' else '확대'}"
+        for i in sector_analysis['issues']
+    )
+
+def _format_tail_risk(risk_metrics: dict) -> str:
+    if 'var_99' not in risk_metrics:
+        return ""
+    return f", 1일 VaR 95% {risk_metrics['var_95']:.2f}% / 99% {risk_metrics['var_99']:.2f}%, CVaR 99% {risk_metrics['cvar_99']:.2f}%"
+
+def build_prompt(portfolio: Portfolio, frame: PortfolioFrame, risk_metrics: dict, sector_analysis: dict, include_actions: bool = True,
+                 token_budget: int = None) -> str:
+    """
+    Build the analysis prompt within a token budget.
+    Only the top holdings by weight are listed, the rest is aggregated into one line.
+    The list shrinks until the prompt fits the budget.
+    """
+    token_budget = token_budget or settings.AI_PROMPT_TOKEN_BUDGET
+    response_format = RESPONSE_FORMAT % (ACTIONS_FORMAT if include_actions else "")
+
+    def render(top_n: int) -> str:
+        return f"""당신은 20년 경력의 전문 포트폴리오 매니저입니다.
+
+포트폴리오: 총 자산 {portfolio.total_value:,.0f}원, {len(frame)}종목, 수익률 {portfolio.profit_rate:.2f}%
+
+보유 종목 (비중 상위):
+{_format_holdings(frame, top_n)}
+
+리스크: 점수 {risk_metrics['risk_score']}/10, 변동성 {risk_metrics['volatility']:.2f}%, 샤프 {risk_metrics['sharpe_ratio']:.3f}{_format_tail_risk(risk_metrics)}
+섹터 비중: {_format_sectors(sector_analysis)}
+섹터 문제점: {_format_issues(sector_analysis)}
+
+JSON 형식으로 분석 결과를 반환하세요.
+{response_format}"""
+
+    top_n = min(settings.AI_PROMPT_TOP_HOLDINGS, len(frame))
+    prompt = render(top_n)
+    while top_n > 1 and count_tokens(prompt) > token_budget:
+        top_n = max(1, top_n * 2 // 3)
+        prompt = render(top_n)
+    return prompt
+
+def is_low_risk(risk_metrics: dict, sector_analysis: dict) -> bool:
+    """
+    Low Monte Carlo 99% VaR and diversified across both sectors and names.
+    risk_score is still a fixed placeholder in risk_calculator, so it can't tell portfolios apart,
+    and the factor-model VaR mostly follows the sector volatility table: a single-sector bank
+    portfolio scores lower than a spread-out one, hence the concentration checks.
+    """
+    var_99 = risk_metrics.get('var_99')
+    if var_99 is None or var_99 > settings.AI_LOW_RISK_VAR_99:
+        return False
+    largest_sector = max(sector_analysis.get('current', {}).values(), default=1.0)
+    if largest_sector > settings.AI_LOW_RISK_MAX_SECTOR_WEIGHT:
+        return False
+    return sector_analysis.get('hhi', 1.0) <= settings.AI_LOW_RISK_MAX_HHI
+
+def select_model(frame: PortfolioFrame, risk_metrics: dict, sector_analysis: dict) -> str:
+    """
+    Small or low-risk portfolios don't need the large model.
+    """
+    if len(frame) <= settings.AI_SMALL_PORTFOLIO_HOLDINGS or is_low_risk(risk_metrics, sector_analysis):
+        return settings.AI_FALLBACK_MODEL
+    return settings.AI_MODEL
+
+def ai_analyze_portfolio(portfolio: Portfolio, frame: PortfolioFrame, risk_metrics: dict, sector_analysis: dict, rebalance_plan: dict = None):
+    # Orders come from the deterministic rebalancer so they always match real holdings
+    immediate_actions = rebalance_plan['trades'] if rebalance_plan else []
 
-def ai_analyze_portfolio(portfolio: Portfolio, risk_metrics: dict, sector_analysis: dict):
     if not settings.OPENAI_API_KEY or "placeholder" in settings.OPENAI_API_KEY:
         # Return mock response if no key
         return {
             "summary": "AI API 키가 설정되지 않아 데모 분석 결과를 표시합니다. 포트폴리오는 전반적으로 안정적이나 IT 섹터 비중이 높습니다.",
             "strengths": ["높은 수익률 잠재력", "우량주 위주 구성"],
             "weaknesses": ["섹터 분산 부족", "높은 변동성"],
-            "immediate_actions": [
-                {"action": "sell", "ticker": "005930", "quantity": 10, "reason": "비중 조절"}
-            ],
+            "immediate_actions": immediate_actions,
             "risk_assessment": "시장 평균보다 다소 높은 리스크를 보이고 있습니다.",
             "long_term_strategy": "기술주 비중을 줄이고 배당주를 늘려 안정성을 확보하세요."
         }
 
     client = OpenAI(api_key=settings.OPENAI_API_KEY)
-    
-    holdings_str = "\n".join([f"- {h.ticker} ({h.name}): {h.quantity}주, 비중 {h.weight:.1f}%" for h in portfolio.holdings])
-    
-    prompt = f"""
-    당신은 20년 경력의 전문 포트폴리오 매니저입니다.
-    
-    포트폴리오 정보:
-    - 총 자산: {portfolio.total_value:,.0f}원
-    - 종목 수: {len(portfolio.holdings)}개
-    - 수익률: {portfolio.profit_rate:.2f}%
-    
-    보유 종목:
-    {holdings_str}
-    
-    리스크 지표:
-    - 리스크 점수: {risk_metrics['risk_score']}/10
-    - 변동성: {risk_metrics['volatility']:.2f}%
-    - 샤프 비율: {risk_metrics['sharpe_ratio']:.3f}
-    
-    섹터 분산:
-    현재: {sector_analysis['current']}
-    문제점: {sector_analysis['issues']}
-    
-    JSON 형식으로 분석 결과를 반환하세요.
-    {{
-      "summary": "종합 평가 (한글 3-4문장)",
-      "strengths": ["강점1", "강점2", "강점3"],
-      "weaknesses": ["약점1", "약점2", "약점3"],
-      "immediate_actions": [
-        {{"action": "sell", "ticker": "TICKER", "quantity": 10, "reason": "이유"}}
-      ],
-      "risk_assessment": "리스크 평가",
-      "long_term_strategy": "장기 전략"
-    }}
-    """
-    
+
+    # Don't ask the model for orders we are going to replace anyway
+    prompt = build_prompt(portfolio, frame, risk_metrics, sector_analysis, include_actions=not rebalance_plan)
+
     try:
         response = client.chat.completions.create(
-            model="gpt-4",
+            model=select_model(frame, risk_metrics, sector_analysis),
             messages=[
                 {"role": "system", "content": "전문 포트폴리오 매니저"},
                 {"role": "user", "content": prompt}
             ],
+            max_tokens=settings.AI_MAX_COMPLETION_TOKENS,
             response_format={"type": "json_object"}
         )
-        return json.loads(response.choices[0].message.content)
+        result = json.loads(response.choices[0].message.content)
+        if rebalance_plan:
+            result["immediate_actions"] = immediate_actions
+        return result
     except Exception as e:
         print(f"OpenAI Error: {e}")
         return {"error": "AI Analysis Failed"}
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Union
+from ..models import Holding
+from ..services import stock_data
+from .portfolio_frame import PortfolioFrame, as_frame
+
+TRADING_DAYS = 252
+
+# Rebalance at the first trading day of each new period
+REBALANCE_PERIODS = {
+    'monthly': 'M',
+    'quarterly': 'Q',
+    'yearly': 'Y',
+}
+
+# Points kept in the equity curve returned to the frontend
+MAX_CURVE_POINTS = 260
+
+def rebalance_points(dates: pd.DatetimeIndex, rebalance: Optional[str]) -> np.ndarray:
+    """
+    Row indices where the portfolio is reset to its target weights (always includes 0).
+    """
+    if not rebalance:
+        return np.array([0])
+    periods = dates.to_period(REBALANCE_PERIODS[rebalance]).asi8
+    changes = np.flatnonzero(periods[1:] != periods[:-1]) + 1
+    return np.concatenate(([0], changes))
+
+def run_backtest(prices: np.ndarray, weights: np.ndarray, points: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Vectorized backtest of K weight vectors over a (T x N) price matrix.
+    Between rebalance points each portfolio is buy-and-hold, so its value is
+        E(t) = E(a) * sum_i w_i * P_i(t) / P_i(a)
+    where a is the last rebalance point before t. The value at each rebalance point
+    is the running product of the period growth factors, no per-day loop needed.
+    Returns equity (T x K, starting at 1), turnover (K, one-way, summed over rebalances).
+    """
+    weights = np.atleast_2d(weights)
+    T = prices.shape[0]
+
+    # Anchor row for every day: the last rebalance point strictly before it (day 0 anchors to itself)
+    anchor = points[np.maximum(np.searchsorted(points, np.arange(T), side='left') - 1, 0)]
+    relative = prices / prices[anchor]            # T x N
+    growth = relative @ weights.T                 # T x K
+
+    # Growth of each completed period, then value at every rebalance point
+    period_growth = growth[points[1:]]            # R-1 x K
+    at_points = np.vstack([np.ones((1, weights.shape[0])), np.cumprod(period_growth, axis=0)])
+    point_index = np.searchsorted(points, anchor)
+    equity = at_points[point_index] * growth
+
+    # Drifted weights right before each rebalance vs. the targets
+    if len(points) > 1:
+        drift = relative[points[1:]][:, None, :] * weights[None, :, :] / period_growth[:, :, None]
+        turnover = 0.5 * np.abs(drift - weights[None, :, :]).sum(axis=2).sum(axis=0)
+    else:
+        turnover = np.zeros(weights.shape[0])
+
+    return {'equity': equity, 'turnover': turnover}
+
+def performance_metrics(equity: np.ndarray, dates: pd.DatetimeIndex) -> Dict[str, np.ndarray]:
+    """
+    CAGR, max drawdown and annualized volatility per column of the equity matrix (all in %).
+    """
+    years = max((dates[-1] - dates[0]).days / 365.25, 1 / 365.25)
+    cagr = (equity[-1] / equity[0]) ** (1 / years) - 1
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1
+    daily = equity[1:] / equity[:-1] - 1
+    volatility = daily.std(axis=0) * np.sqrt(TRADING_DAYS) if len(daily) > 1 else np.zeros(equity.shape[1])
+    return {
+        'cagr': cagr * 100,
+        'max_drawdown': drawdown.min(axis=0) * 100,
+        'volatility': volatility * 100,
+        'years': years,
+    }
+
+def prepare_prices(history: pd.DataFrame, tickers: List[str]) -> pd.DataFrame:
+    """
+    Align markets with different holidays: carry the last close forward,
+    and before a ticker's first trade assume its first close.
+    Tickers without any history are dropped.
+    """
+    prices = history.reindex(columns=tickers).ffill().bfill()
+    return prices.dropna(axis=1, how='all')
+
+def backtest_weights(
+    tickers: List[str],
+    markets: List[str],
+    weights: np.ndarray,
+    years: int = 1,
+    rebalance: Optional[str] = None,
+    end: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Backtest one or more weight variants (K x N) over the same tickers.
+    Holdings without price history are dropped and the remaining weights renormalized.
+    """
+    end = end or datetime.now()
+    start = end - timedelta(days=int(years * 365.25))
+    history = stock_data.get_price_history(list(zip(tickers, markets)), start, end)
+    prices = prepare_prices(history, tickers)
+    if prices.shape[0] < 2 or prices.shape[1] == 0:
+        return {'error': 'Not enough price history'}
+
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    keep = np.isin(tickers, prices.columns)
+    weights = weights[:, keep]
+    kept = weights.sum(axis=1, keepdims=True)
+    if np.any(kept <= 0):
+        # Only zero-weight holdings have prices, nothing to renormalize
+        return {'error': 'No price history for the weighted holdings'}
+    weights = weights / kept
+
+    dates = prices.index
+    points = rebalance_points(dates, rebalance)
+    result = run_backtest(prices.to_numpy(), weights, points)
+    metrics = performance_metrics(result['equity'], dates)
+
+    return {
+        'dates': dates,
+        'equity': result['equity'],
+        'cagr': metrics['cagr'],
+        'max_drawdown': metrics['max_drawdown'],
+        'volatility': metrics['volatility'],
+        'turnover': result['turnover'] / metrics['years'] * 100,  # annualized, %
+        'dropped': [t for t, k in zip(tickers, keep) if not k],
+    }
+
+def backtest_portfolio(
+    holdings: Union[List[Holding], PortfolioFrame],
+    years: int = 1,
+    rebalance: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    How the current allocation would have done over the last `years` years.
+    """
+    frame = as_frame(holdings)
+    values = frame.market_value
+    if len(frame) == 0 or values.sum() <= 0:
+        return {'error': 'Portfolio has no holdings'}
+
+    result = backtest_weights(list(frame.ticker), list(frame.market), values / values.sum(), years, rebalance)
+    if 'error' in result:
+        return result
+
+    dates = result['dates']
+    curve = result['equity'][:, 0]
+    step = max(1, len(dates) // MAX_CURVE_POINTS)
+    idx = np.unique(np.append(np.arange(0, len(dates), step), len(dates) - 1))
+
+    return {
+        'years': years,
+        'rebalance': rebalance,
+        'start': dates[0].strftime('%Y-%m-%d'),
+        'end': dates[-1].strftime('%Y-%m-%d'),
+        'cagr': float(result['cagr'][0]),
+        'max_drawdown': float(result['max_drawdown'][0]),
+        'volatility': float(result['volatility'][0]),
+        'turnover': float(result['turnover'][0]),
+        'dropped_tickers': result['dropped'],
+        'equity_curve': [
+            {'date': dates[i].strftime('%Y-%m-%d'), 'value': float(curve[i])} for i in idx
+        ],
+    }
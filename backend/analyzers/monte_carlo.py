@@ -0,0 +1,204 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Sequence, Union
+from ..models import Holding
+from .sectors import SECTORS
+from .portfolio_frame import PortfolioFrame, as_frame
+
+# Annualized volatility assumptions per sector (no full price history in the MVP yet)
+SECTOR_VOLATILITY = {
+    'IT': 0.32,
+    '금융': 0.24,
+    '헬스케어': 0.30,
+    '경기소비재': 0.28,
+    '산업재': 0.26,
+    '에너지': 0.30,
+    '커뮤니케이션': 0.27,
+    '소재': 0.29,
+    '기타': 0.25,
+}
+# Indexed by sector code
+SECTOR_VOLATILITY_BY_CODE = np.array([SECTOR_VOLATILITY[s] for s in SECTORS])
+
+# Variance split of a single stock: market factor / sector factor / idiosyncratic
+MARKET_SHARE = 0.50
+SECTOR_SHARE = 0.25
+IDIO_SHARE = 0.25
+
+TRADING_DAYS = 252
+CONFIDENCE_LEVELS = (0.95, 0.99)
+DEFAULT_PATHS = 100_000
+DEFAULT_SEED = 42
+# Student-t degrees of freedom for fat tails (None -> gaussian)
+DEFAULT_TAIL_DF = 5
+# Ceiling for the random draw buffer of a single chunk
+MAX_CHUNK_BYTES = 16 * 1024 * 1024
+# Below this many portfolios a process pool costs more than it saves
+MIN_POOL_BATCH = 4
+
+def factor_exposure(weights: np.ndarray, sector_codes: np.ndarray, horizon_days: int = 1) -> np.ndarray:
+    """
+    Exposure of the portfolio to each independent shock of the factor model:
+    [market, sector_1 .. sector_k, idiosyncratic].
+    The idiosyncratic terms are independent so they collapse into a single shock.
+    """
+    scale = np.sqrt(horizon_days / TRADING_DAYS)
+    sigma = SECTOR_VOLATILITY_BY_CODE[sector_codes] * scale
+
+    sector_exposure = np.bincount(sector_codes, weights=weights * sigma * np.sqrt(SECTOR_SHARE), minlength=len(SECTORS))
+
+    market_exposure = np.dot(weights, sigma) * np.sqrt(MARKET_SHARE)
+    idio_exposure = np.sqrt(np.sum((weights * sigma) ** 2) * IDIO_SHARE)
+
+    return np.concatenate(([market_exposure], sector_exposure, [idio_exposure]))
+
+def cholesky_exposure(weights: np.ndarray, cov: np.ndarray, horizon_days: int = 1) -> np.ndarray:
+    """
+    Exposure to independent shocks for an explicit (daily) covariance matrix.
+    r = L z  ->  w'r = (L'w)'z
+    """
+    L = np.linalg.cholesky(cov * horizon_days)
+    return L.T @ weights
+
+def simulate_tail_losses(
+    exposure: np.ndarray,
+    n_paths: int = DEFAULT_PATHS,
+    seed: Optional[int] = DEFAULT_SEED,
+    tail_df: Optional[int] = DEFAULT_TAIL_DF,
+    keep: Optional[int] = None,
+    max_chunk_bytes: int = MAX_CHUNK_BYTES,
+) -> np.ndarray:
+    """
+    Draw portfolio returns in fixed-size chunks and keep only the `keep` worst losses.
+    Memory is one chunk of draws plus the tail, i.e. (1 - lowest confidence level) of the paths,
+    the full path vector is never materialized.
+    """
+    if keep is None:
+        keep = tail_size(n_paths)
+    rng = np.random.default_rng(seed)
+    n_shocks = len(exposure)
+    chunk = max(1, min(n_paths, max_chunk_bytes // (8 * n_shocks)))
+
+    z = np.empty((chunk, n_shocks))
+    losses = np.empty(chunk)
+    tail = np.empty(0)
+    for start in range(0, n_paths, chunk):
+        size = min(chunk, n_paths - start)
+        buf = z[:size]
+        rng.standard_normal(out=buf)
+        out = losses[:size]
+        np.dot(buf, -exposure, out=out)
+        if tail_df:
+            # Multivariate t: common chi-square mixing, rescaled to unit variance
+            out *= np.sqrt((tail_df - 2) / rng.chisquare(tail_df, size))
+        merged = np.concatenate((tail, out))
+        if len(merged) > keep:
+            merged = np.partition(merged, len(merged) - keep)[len(merged) - keep:]
+        tail = merged
+    return np.sort(tail)[::-1]
+
+def tail_size(n_paths: int, levels: Sequence[float] = CONFIDENCE_LEVELS) -> int:
+    """
+    Number of worst paths needed for VaR / CVaR at the lowest confidence level.
+    """
+    return n_paths - int(np.floor(min(levels) * n_paths))
+
+def tail_metrics(worst_losses: np.ndarray, n_paths: int, levels: Sequence[float] = CONFIDENCE_LEVELS) -> Dict[str, float]:
+    """
+    VaR / CVaR as positive loss percentages from the worst losses sorted in descending order.
+    """
+    result = {}
+    for level in levels:
+        tail = worst_losses[:tail_size(n_paths, [level])]
+        label = int(round(level * 100))
+        result[f'var_{label}'] = float(tail[-1] * 100)
+        result[f'cvar_{label}'] = float(tail.mean() * 100)
+    return result
+
+def _simulate_portfolio(task) -> Dict[str, float]:
+    exposure, n_paths, seed, tail_df = task
+    worst = simulate_tail_losses(exposure, n_paths=n_paths, seed=seed, tail_df=tail_df)
+    return tail_metrics(worst, n_paths)
+
+def portfolio_exposure(weights: np.ndarray, sector_codes: np.ndarray, horizon_days: int = 1,
+                       cov: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Factor model by default, or the Cholesky factor of `cov` when a daily covariance
+    matrix (aligned with the holdings) is available.
+    """
+    if cov is not None:
+        return cholesky_exposure(weights, cov, horizon_days)
+    return factor_exposure(weights, sector_codes, horizon_days)
+
+def _holdings_to_arrays(holdings: Union[List[Holding], PortfolioFrame]):
+    frame = as_frame(holdings)
+    values = frame.market_value
+    total = values.sum()
+    if total <= 0:
+        return None, None
+    return values / total, frame.sector
+
+def empty_tail_metrics() -> Dict[str, float]:
+    result = {}
+    for level in CONFIDENCE_LEVELS:
+        label = int(round(level * 100))
+        result[f'var_{label}'] = 0.0
+        result[f'cvar_{label}'] = 0.0
+    return result
+
+def calculate_tail_risk(
+    holdings: Union[List[Holding], PortfolioFrame],
+    n_paths: int = DEFAULT_PATHS,
+    seed: Optional[int] = DEFAULT_SEED,
+    horizon_days: int = 1,
+    tail_df: Optional[int] = DEFAULT_TAIL_DF,
+    cov: Optional[np.ndarray] = None,
+) -> Dict[str, float]:
+    """
+    Monte Carlo 95% / 99% VaR and CVaR (in % of portfolio value) for one portfolio.
+    cov: optional daily covariance matrix of the holdings' returns, replaces the sector factor model.
+    """
+    weights, sector_codes = _holdings_to_arrays(holdings)
+    if weights is None:
+        return empty_tail_metrics()
+    exposure = portfolio_exposure(weights, sector_codes, horizon_days, cov)
+    return _simulate_portfolio((exposure, n_paths, seed, tail_df))
+
+def calculate_tail_risk_batch(
+    portfolios: List[Union[List[Holding], PortfolioFrame]],
+    n_paths: int = DEFAULT_PATHS,
+    seed: Optional[int] = DEFAULT_SEED,
+    horizon_days: int = 1,
+    tail_df: Optional[int] = DEFAULT_TAIL_DF,
+    max_workers: Optional[int] = None,
+    covs: Optional[List[Optional[np.ndarray]]] = None,
+) -> List[Dict[str, float]]:
+    """
+    Score many portfolios. Each portfolio gets its own child seed so results
+    don't depend on how the work is scheduled across processes.
+    """
+    child_seeds = np.random.SeedSequence(seed).spawn(len(portfolios))
+    covs = covs or [None] * len(portfolios)
+
+    tasks = []
+    empty = set()
+    for i, holdings in enumerate(portfolios):
+        weights, sector_codes = _holdings_to_arrays(holdings)
+        if weights is None:
+            empty.add(i)
+            continue
+        child = int(child_seeds[i].generate_state(1)[0])
+        exposure = portfolio_exposure(weights, sector_codes, horizon_days, covs[i])
+        tasks.append((exposure, n_paths, child, tail_df))
+
+    if len(tasks) >= MIN_POOL_BATCH and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            scored = list(pool.map(_simulate_portfolio, tasks))
+    else:
+        scored = [_simulate_portfolio(t) for t in tasks]
+
+    results = []
+    it = iter(scored)
+    for i in range(len(portfolios)):
+        results.append(empty_tail_metrics() if i in empty else next(it))
+    return results
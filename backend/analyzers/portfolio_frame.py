@@ -0,0 +1,126 @@
+import numpy as np
+from typing import List, Dict, Optional, Union, Iterable
+from sqlalchemy.orm import Session
+from ..models import Holding
+from ..config import settings
+from .sectors import resolve_sector, SECTOR_CODES
+
+# Columns projected from the holdings table, no ORM objects are hydrated
+HOLDING_COLUMNS = (
+    Holding.id,
+    Holding.ticker,
+    Holding.name,
+    Holding.market,
+    Holding.sector,
+    Holding.quantity,
+    Holding.avg_price,
+    Holding.current_price,
+)
+
+def default_fx() -> Dict[str, float]:
+    """
+    KRW per unit of each market's trading currency, from the configured fallback rate.
+    """
+    return {'KR': 1.0, 'US': settings.FX_USD_KRW}
+
+class PortfolioFrame:
+    """
+    Struct-of-arrays view of a portfolio's holdings.
+    One NumPy array per column, so analyzers work on whole columns
+    instead of walking ORM instances attribute by attribute.
+    """
+    __slots__ = ('id', 'ticker', 'name', 'market', 'sector', 'quantity', 'avg_price', 'price')
+
+    def __init__(self, id, ticker, name, market, sector, quantity, avg_price, price):
+        self.id = id
+        self.ticker = ticker
+        self.name = name
+        self.market = market
+        self.sector = sector  # int codes, see sectors.SECTORS
+        self.quantity = quantity
+        self.avg_price = avg_price
+        self.price = price
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "PortfolioFrame":
+        """
+        Build from (id, ticker, name, market, sector, quantity, avg_price, current_price) rows.
+        """
+        rows = list(rows)
+        if not rows:
+            return cls.empty()
+        ids, tickers, names, markets, sectors, quantity, avg_price, price = zip(*rows)
+        return cls(
+            id=np.array(ids, dtype=object),
+            ticker=np.array(tickers, dtype=object),
+            name=np.array([n or '' for n in names], dtype=object),
+            market=np.array([m or '' for m in markets], dtype='U10'),
+            sector=np.array([SECTOR_CODES[resolve_sector(t, s)] for t, s in zip(tickers, sectors)], dtype=np.int8),
+            quantity=np.array(quantity, dtype=float),
+            avg_price=np.array(avg_price, dtype=float),
+            price=np.array([p or 0.0 for p in price], dtype=float),
+        )
+
+    @classmethod
+    def from_holdings(cls, holdings: List[Holding]) -> "PortfolioFrame":
+        return cls.from_rows(
+            (h.id, h.ticker, h.name, h.market, h.sector, h.quantity, h.avg_price, h.current_price)
+            for h in holdings
+        )
+
+    @classmethod
+    def empty(cls) -> "PortfolioFrame":
+        return cls(
+            id=np.empty(0, dtype=object),
+            ticker=np.empty(0, dtype=object),
+            name=np.empty(0, dtype=object),
+            market=np.empty(0, dtype='U10'),
+            sector=np.empty(0, dtype=np.int8),
+            quantity=np.empty(0),
+            avg_price=np.empty(0),
+            price=np.empty(0),
+        )
+
+    def __len__(self):
+        return len(self.ticker)
+
+    @property
+    def market_value(self) -> np.ndarray:
+        return self.quantity * self.price
+
+    def fx_rate(self, fx: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """
+        Per-holding rate into KRW. Anything not listed on KRX is treated as USD.
+        """
+        fx = fx or default_fx()
+        return np.where(self.market == 'KR', fx['KR'], fx['US'])
+
+    def base_value(self, fx: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """
+        Market value in KRW, comparable across markets.
+        """
+        return self.market_value * self.fx_rate(fx)
+
+    @property
+    def cost(self) -> np.ndarray:
+        return self.quantity * self.avg_price
+
+    @property
+    def weight(self) -> np.ndarray:
+        """
+        Portfolio weight in %.
+        """
+        value = self.market_value
+        total = value.sum()
+        if total <= 0:
+            return np.zeros(len(self))
+        return value / total * 100
+
+def as_frame(holdings: Union[List[Holding], PortfolioFrame]) -> PortfolioFrame:
+    if isinstance(holdings, PortfolioFrame):
+        return holdings
+    return PortfolioFrame.from_holdings(holdings)
+
+def load_frame(db: Session, portfolio_id) -> PortfolioFrame:
+    rows = db.query(*HOLDING_COLUMNS).filter(Holding.portfolio_id == portfolio_id).all()
+    return PortfolioFrame.from_rows(rows)
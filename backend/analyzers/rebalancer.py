@@ -0,0 +1,159 @@
+import numpy as np
+from typing import List, Dict, Any, Optional, Union
+from ..models import Holding
+from .sectors import SECTOR_CODES
+from .portfolio_frame import PortfolioFrame, as_frame
+
+# Relative tolerance for float round-off in weight -> lot -> cash round trips
+ROUNDING_EPS = 1e-9
+
+# Minimum tradable unit per market
+LOT_SIZE = {
+    'KR': 1,
+    'US': 1,
+}
+
+def target_weights_from_sectors(holdings: Union[List[Holding], PortfolioFrame], sector_analysis: Dict[str, Any],
+                                fx: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """
+    Turn the sector issues of analyze_sector_distribution into per-holding target weights.
+    Holdings in a flagged sector are scaled to the recommended sector weight,
+    the remaining weight is spread over the other holdings in proportion to their current value.
+    Sectors we don't hold can't be bought here, that weight is left to the other holdings.
+    Weights are taken on KRW values, fx as in PortfolioFrame.fx_rate.
+    """
+    frame = as_frame(holdings)
+    values = frame.base_value(fx)
+    total = values.sum()
+    if total <= 0:
+        return np.zeros(len(frame))
+
+    weights = values / total
+
+    targets = weights.copy()
+    flagged = np.zeros(len(frame), dtype=bool)
+    for issue in sector_analysis.get('issues', []):
+        in_sector = frame.sector == SECTOR_CODES[issue['sector']]
+        current = weights[in_sector].sum()
+        if current <= 0:
+            continue
+        targets[in_sector] = weights[in_sector] / current * issue['recommended']
+        flagged |= in_sector
+
+    rest = weights[~flagged].sum()
+    remaining = max(0.0, 1.0 - targets[flagged].sum())
+    if rest > 0:
+        targets[~flagged] = weights[~flagged] / rest * remaining
+    elif targets.sum() > 0:
+        targets = targets / targets.sum()
+    return targets
+
+def compute_trades(
+    quantity: np.ndarray,
+    price: np.ndarray,
+    target_weight: np.ndarray,
+    lot_size: Optional[np.ndarray] = None,
+    cash: Optional[np.ndarray] = None,
+):
+    """
+    Integer share trades for a batch of portfolios (portfolios x holdings, zero-padded).
+    1. Round every target position down to whole lots, which never spends more than we have.
+    2. Spend the leftover cash one lot at a time on the largest shortfalls,
+       but only where the extra lot brings the position closer to target.
+    Holdings without a price (price <= 0) are left untouched.
+    Returns (new_quantity, trade_quantity, cash_left, tracking_error %).
+    """
+    quantity = np.atleast_2d(np.asarray(quantity, dtype=float))
+    price = np.atleast_2d(np.asarray(price, dtype=float))
+    target_weight = np.atleast_2d(np.asarray(target_weight, dtype=float))
+    lot = np.ones_like(price) if lot_size is None else np.atleast_2d(np.asarray(lot_size, dtype=float))
+    cash = np.zeros(len(price)) if cash is None else np.asarray(cash, dtype=float).reshape(-1)
+
+    valid = price > 0
+    lot_cost = np.where(valid, price * lot, 1.0)
+    total = (quantity * price).sum(axis=1) + cash
+
+    target_value = target_weight * total[:, None]
+    # A target of exactly k lots can come out as k - 1e-15 after the weight round trip
+    new_quantity = np.where(valid, np.floor(target_value / lot_cost + ROUNDING_EPS) * lot, quantity)
+    cash_left = total - (new_quantity * price).sum(axis=1)
+    eps = ROUNDING_EPS * np.maximum(total, 1.0)
+
+    # At most one extra lot per holding can still help, so one pass in shortfall order is enough
+    shortfall = np.where(valid, target_value - new_quantity * price, -np.inf)
+    order = np.argsort(-shortfall, axis=1)
+    rows = np.arange(len(price))
+    for k in range(price.shape[1]):
+        idx = order[:, k]
+        cost = lot_cost[rows, idx]
+        buy = (shortfall[rows, idx] > cost / 2) & (cost <= cash_left + eps)
+        new_quantity[rows, idx] += np.where(buy, lot[rows, idx], 0.0)
+        cash_left -= np.where(buy, cost, 0.0)
+
+    new_weight = np.divide(new_quantity * price, total[:, None], out=np.zeros_like(price), where=total[:, None] > 0)
+    tracking_error = np.sqrt(((new_weight - target_weight) ** 2).sum(axis=1)) * 100
+
+    return new_quantity, new_quantity - quantity, cash_left, tracking_error
+
+def _pad(rows: List[np.ndarray], width: int) -> np.ndarray:
+    out = np.zeros((len(rows), width))
+    for i, r in enumerate(rows):
+        out[i, :len(r)] = r
+    return out
+
+def rebalance_portfolios(
+    portfolios: List[Union[List[Holding], PortfolioFrame]],
+    target_weights: List[np.ndarray],
+    cash: Optional[List[float]] = None,
+    fx: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Build executable rebalancing orders for all portfolios of a user in one vectorized pass.
+    Sizing runs on KRW prices so KR and US holdings are comparable; cash and cash_left are in KRW,
+    order prices and amounts in the holding's own currency.
+    """
+    if cash is None:
+        cash = [0.0] * len(portfolios)
+    frames = [as_frame(h) for h in portfolios]
+    width = max((len(f) for f in frames), default=0)
+    if width == 0:
+        return [{'trades': [], 'cash_left': float(c), 'tracking_error': 0.0} for c in cash]
+
+    quantity = _pad([f.quantity for f in frames], width)
+    local_price = _pad([f.price for f in frames], width)
+    price = local_price * _pad([f.fx_rate(fx) for f in frames], width)
+    lot = _pad([np.array([LOT_SIZE.get(m, 1) for m in f.market], dtype=float) for f in frames], width)
+    lot[lot == 0] = 1
+    targets = _pad([np.asarray(t, dtype=float) for t in target_weights], width)
+
+    _, trade_qty, cash_left, tracking_error = compute_trades(quantity, price, targets, lot, cash)
+    value = quantity * price
+    total = value.sum(axis=1, keepdims=True) + np.asarray(cash, dtype=float).reshape(-1, 1)
+    current = np.divide(value, total, out=np.zeros_like(value), where=total > 0)
+
+    plans = []
+    for p, frame in enumerate(frames):
+        trades = []
+        for i in np.flatnonzero(trade_qty[p, :len(frame)]):
+            qty = int(trade_qty[p, i])
+            trades.append({
+                'action': 'buy' if qty > 0 else 'sell',
+                'ticker': frame.ticker[i],
+                'quantity': abs(qty),
+                'price': float(local_price[p, i]),
+                'amount': float(abs(qty) * local_price[p, i]),
+                'currency': 'KRW' if frame.market[i] == 'KR' else 'USD',
+                'reason': f"목표 비중 {targets[p, i] * 100:.1f}% 맞춤 (현재 {current[p, i] * 100:.1f}%)",
+            })
+        plans.append({
+            'trades': trades,
+            'cash_left': float(cash_left[p]),
+            'tracking_error': float(tracking_error[p]),
+        })
+    return plans
+
+def build_rebalance_plan(holdings: Union[List[Holding], PortfolioFrame], sector_analysis: Dict[str, Any], cash: float = 0.0,
+                         fx: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    frame = as_frame(holdings)
+    targets = target_weights_from_sectors(frame, sector_analysis, fx)
+    return rebalance_portfolios([frame], [targets], [cash], fx)[0]
@@ -1,16 +1,17 @@
 import numpy as np
 import pandas as pd
-from typing import List
+from typing import List, Union
 from ..models import Holding
+from .portfolio_frame import PortfolioFrame
 
-def calculate_risk_metrics(holdings: List[Holding]):
+def calculate_risk_metrics(holdings: Union[List[Holding], PortfolioFrame]):
     """
     Calculate risk metrics for the portfolio.
     This is a simplified implementation for the MVP.
     """
     
     # 1. Prepare data
-    if not holdings:
+    if len(holdings) == 0:
         return {
             'risk_score': 0,
             'risk_level': "undefined",
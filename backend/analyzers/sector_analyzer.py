@@ -1,18 +1,8 @@
-from typing import List, Dict, Any
+import numpy as np
+from typing import List, Dict, Any, Optional, Union
 from ..models import Holding
-
-SECTOR_MAPPING = {
-    # Demo mapping
-    '005930': 'IT', '000660': 'IT', 'AAPL': 'IT', 'MSFT': 'IT',
-    '035420': '커뮤니케이션', 'GOOGL': '커뮤니케이션',
-    '005380': '경기소비재', 'TSLA': '경기소비재',
-    '005935': 'IT',
-    '068270': '헬스케어', 'JNJ': '헬스케어',
-    '051910': '소재',
-    '006400': '소재',
-    '005490': '소재', # POSCO
-    '105560': '금융', # KB Financial
-}
+from .sectors import SECTOR_MAPPING, SECTOR_NAME_MAP, SECTORS, resolve_sector
+from .portfolio_frame import PortfolioFrame, as_frame
 
 # Korean Sector Names
 IDEAL_WEIGHTS = {
@@ -27,28 +17,21 @@ IDEAL_WEIGHTS = {
     '소재': 0.0
 }
 
-def analyze_sector_distribution(holdings: List[Holding]) -> Dict[str, Any]:
-    current_dist = {}
-    total_val = sum(h.market_value for h in holdings)
+def analyze_sector_distribution(holdings: Union[List[Holding], PortfolioFrame],
+                                fx: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Sector weights on KRW values (fx as in PortfolioFrame.fx_rate) and the sectors off their ideal weight.
+    """
+    frame = as_frame(holdings)
+    values = frame.base_value(fx)
+    total_val = values.sum()
     
     if total_val == 0:
-        return {'current': {}, 'ideal': IDEAL_WEIGHTS, 'issues': []}
-
-    for h in holdings:
-        # Try to get sector from mapping, otherwise from holding data if available, else Other
-        raw_sector = SECTOR_MAPPING.get(h.ticker, h.sector or 'Other')
-        # Map some common english if they come from h.sector
-        sector_map = {
-            'Finance': '금융', 'Healthcare': '헬스케어', 'Consumer': '경기소비재',
-            'Industrial': '산업재', 'Energy': '에너지', 'Communication': '커뮤니케이션',
-            'Materials': '소재', 'IT': 'IT', 'Other': '기타'
-        }
-        sector = sector_map.get(raw_sector, raw_sector)
-        if sector not in sector_map.values() and sector != 'IT':
-             sector = '기타'
+        return {'current': {}, 'ideal': IDEAL_WEIGHTS, 'issues': [], 'hhi': 0.0}
 
-        weight = h.market_value / total_val
-        current_dist[sector] = current_dist.get(sector, 0) + weight
+    weights = np.bincount(frame.sector, weights=values / total_val, minlength=len(SECTORS))
+    held = np.bincount(frame.sector, minlength=len(SECTORS)) > 0
+    current_dist = {SECTORS[code]: float(weights[code]) for code in np.flatnonzero(held)}
 
     issues = []
     # Only check major ideal sectors
@@ -71,5 +54,7 @@ def analyze_sector_distribution(holdings: List[Holding]) -> Dict[str, Any]:
     return {
         'current': current_dist,
         'ideal': IDEAL_WEIGHTS,
-        'issues': issues
+        'issues': issues,
+        # Herfindahl index of the holding weights, 1 / hhi is the effective number of holdings
+        'hhi': float(np.sum((values / total_val) ** 2)),
     }
@@ -0,0 +1,36 @@
+from typing import Optional
+
+SECTOR_MAPPING = {
+    # Demo mapping
+    '005930': 'IT', '000660': 'IT', 'AAPL': 'IT', 'MSFT': 'IT',
+    '035420': '커뮤니케이션', 'GOOGL': '커뮤니케이션',
+    '005380': '경기소비재', 'TSLA': '경기소비재',
+    '005935': 'IT',
+    '068270': '헬스케어', 'JNJ': '헬스케어',
+    '051910': '소재',
+    '006400': '소재',
+    '005490': '소재', # POSCO
+    '105560': '금융', # KB Financial
+}
+
+# Map some common english if they come from h.sector
+SECTOR_NAME_MAP = {
+    'Finance': '금융', 'Healthcare': '헬스케어', 'Consumer': '경기소비재',
+    'Industrial': '산업재', 'Energy': '에너지', 'Communication': '커뮤니케이션',
+    'Materials': '소재', 'IT': 'IT', 'Other': '기타'
+}
+
+# Korean sector names and their integer codes (used by PortfolioFrame)
+SECTORS = list(dict.fromkeys(SECTOR_NAME_MAP.values()))
+SECTOR_CODES = {name: code for code, name in enumerate(SECTORS)}
+
+def resolve_sector(ticker: str, sector: Optional[str] = None) -> str:
+    """
+    Resolve the Korean sector name for a ticker.
+    Try the demo mapping first, otherwise the holding's own sector, else Other.
+    """
+    raw_sector = SECTOR_MAPPING.get(ticker, sector or 'Other')
+    resolved = SECTOR_NAME_MAP.get(raw_sector, raw_sector)
+    if resolved not in SECTOR_CODES:
+        resolved = '기타'
+    return resolved
@@ -0,0 +1,149 @@
+import numpy as np
+from functools import lru_cache
+from typing import List, Dict, Any, Union
+from ..models import Holding
+from .sectors import resolve_sector, SECTORS
+from .portfolio_frame import PortfolioFrame, as_frame
+
+# Historical shock scenarios.
+# market: close-to-close index move between the two dates of `period`
+#         (KR = KOSPI, US = S&P 500)
+# sector_beta: sector move relative to the market move (negative -> moved against the market)
+# ticker: absolute overrides for names whose move is well known
+HISTORICAL_SCENARIOS = {
+    'gfc_2008': {
+        'name': '2008 글로벌 금융위기',
+        'period': '2008-08-29 ~ 2008-10-24',
+        'market': {'KR': -0.363, 'US': -0.317},  # KOSPI 1474.24 -> 938.75, S&P 1282.83 -> 876.77
+        'sector_beta': {
+            '금융': 1.40, '소재': 1.30, '경기소비재': 1.20, '산업재': 1.20,
+            '에너지': 1.10, 'IT': 1.00, '커뮤니케이션': 0.80, '헬스케어': 0.70,
+        },
+        'ticker': {},
+    },
+    'covid_2020': {
+        'name': '2020 코로나 폭락',
+        'period': '2020-02-19 ~ 2020-03-19',
+        'market': {'KR': -0.340, 'US': -0.288},  # KOSPI 2208.88 -> 1457.64, S&P 3386.15 -> 2409.39
+        'sector_beta': {
+            '에너지': 1.50, '금융': 1.20, '산업재': 1.20, '경기소비재': 1.10,
+            '소재': 1.00, '커뮤니케이션': 0.90, 'IT': 0.85, '헬스케어': 0.70,
+        },
+        'ticker': {},
+    },
+    'rate_shock_2022': {
+        'name': '2022 금리 인상 충격',
+        'period': '2022-01-03 ~ 2022-10-12',
+        'market': {'KR': -0.263, 'US': -0.254},  # KOSPI 2988.77 -> 2202.47, S&P 4796.56 -> 3577.03
+        'sector_beta': {
+            '커뮤니케이션': 1.40, 'IT': 1.35, '경기소비재': 1.30, '소재': 0.90,
+            '산업재': 0.80, '금융': 0.70, '헬스케어': 0.50, '에너지': -0.60,
+        },
+        'ticker': {},
+    },
+    'kospi_2011_aug': {
+        'name': '2011 8월 KOSPI 급락 (美 신용등급 강등)',
+        'period': '2011-08-01 ~ 2011-08-19',
+        'market': {'KR': -0.197, 'US': -0.127},  # KOSPI 2172.31 -> 1744.88, S&P 1286.94 -> 1123.53
+        'sector_beta': {
+            'IT': 1.20, '산업재': 1.20, '소재': 1.10, '금융': 1.10,
+            '경기소비재': 1.00, '에너지': 1.00, '커뮤니케이션': 0.70, '헬스케어': 0.60,
+        },
+        'ticker': {},
+    },
+    'kospi_2024_aug': {
+        'name': '2024-08-05 KOSPI 블랙먼데이',
+        'period': '2024-08-02 ~ 2024-08-05',
+        'market': {'KR': -0.088, 'US': -0.030},  # KOSPI 2676.19 -> 2441.55, S&P 5346.56 -> 5186.33
+        'sector_beta': {
+            'IT': 1.15, '금융': 1.10, '산업재': 1.05, '소재': 1.00,
+            '경기소비재': 1.00, '에너지': 0.90, '커뮤니케이션': 0.90, '헬스케어': 0.80,
+        },
+        'ticker': {'005930': -0.103, '000660': -0.099},
+    },
+}
+
+MARKETS = ('KR', 'US')
+
+@lru_cache(maxsize=1)
+def shock_matrix():
+    """
+    Precompute the scenario x exposure-column shock matrix once.
+    Columns are (market, sector) buckets followed by one column per overridden ticker,
+    so the P&L of any set of portfolios is a single matrix product.
+    """
+    # Bucket column of (market, sector) is market_index * len(SECTORS) + sector code
+    columns = [(m, s) for m in MARKETS for s in SECTORS]
+    override_tickers = sorted({t for sc in HISTORICAL_SCENARIOS.values() for t in sc['ticker']})
+    columns += [('ticker', t) for t in override_tickers]
+    column_index = {c: i for i, c in enumerate(columns)}
+
+    keys = list(HISTORICAL_SCENARIOS.keys())
+    shocks = np.zeros((len(keys), len(columns)))
+    for i, key in enumerate(keys):
+        sc = HISTORICAL_SCENARIOS[key]
+        for m in MARKETS:
+            for s in SECTORS:
+                shocks[i, column_index[(m, s)]] = sc['market'][m] * sc['sector_beta'].get(s, 1.0)
+        for t in override_tickers:
+            # Tickers without an override in this scenario fall back to their bucket shock
+            m, s = 'KR' if t.isdigit() else 'US', resolve_sector(t)
+            shocks[i, column_index[('ticker', t)]] = sc['ticker'].get(t, shocks[i, column_index[(m, s)]])
+
+    # Column -> sector indicator, for the per-sector breakdown
+    sector_index = {s: i for i, s in enumerate(SECTORS)}
+    column_sector = np.zeros((len(columns), len(SECTORS)))
+    for c, (kind, name) in enumerate(columns):
+        sector = resolve_sector(name) if kind == 'ticker' else name
+        column_sector[c, sector_index[sector]] = 1.0
+
+    return keys, column_index, shocks, column_sector
+
+def build_exposures(portfolios: List[Union[List[Holding], PortfolioFrame]]) -> np.ndarray:
+    """
+    Market value per shock column for every portfolio (portfolios x columns).
+    """
+    _, column_index, shocks, _ = shock_matrix()
+    exposures = np.zeros((len(portfolios), shocks.shape[1]))
+    for p, holdings in enumerate(portfolios):
+        frame = as_frame(holdings)
+        # Anything not listed on KRX is treated as US
+        bucket = np.where(frame.market == 'KR', 0, 1) * len(SECTORS) + frame.sector
+        override = np.array([column_index.get(('ticker', t), -1) for t in frame.ticker], dtype=int)
+        col = np.where(override >= 0, override, bucket)
+        exposures[p] = np.bincount(col, weights=frame.market_value, minlength=shocks.shape[1])
+    return exposures
+
+def run_stress_tests_batch(portfolios: List[Union[List[Holding], PortfolioFrame]]) -> List[List[Dict[str, Any]]]:
+    """
+    Apply every historical scenario to every portfolio.
+    """
+    keys, _, shocks, column_sector = shock_matrix()
+    exposures = build_exposures(portfolios)
+
+    # portfolios x scenarios
+    pnl = exposures @ shocks.T
+    # portfolios x scenarios x sectors
+    by_sector = np.einsum('pc,sc,cg->psg', exposures, shocks, column_sector, optimize=True)
+    totals = exposures.sum(axis=1)
+
+    results = []
+    for p in range(len(portfolios)):
+        scenarios = []
+        for i, key in enumerate(keys):
+            sc = HISTORICAL_SCENARIOS[key]
+            scenarios.append({
+                'scenario': key,
+                'name': sc['name'],
+                'period': sc['period'],
+                'pnl': float(pnl[p, i]),
+                'pnl_rate': float(pnl[p, i] / totals[p] * 100) if totals[p] > 0 else 0.0,
+                'by_sector': {
+                    s: float(by_sector[p, i, g]) for g, s in enumerate(SECTORS) if by_sector[p, i, g] != 0
+                },
+            })
+        results.append(scenarios)
+    return results
+
+def run_stress_tests(holdings: Union[List[Holding], PortfolioFrame]) -> List[Dict[str, Any]]:
+    return run_stress_tests_batch([holdings])[0]
@@ -0,0 +1,81 @@
+"""
+Login-storm benchmark.
+
+Fires a burst of concurrent logins and, at the same time, a stream of
+authenticated GET /auth/me requests, then reports the latency of both.
+Before bcrypt moved off the request workers the /me latency climbed with the
+size of the burst; now it should stay close to the idle baseline.
+
+Run against a live server (httpx is in requirements.txt):
+    python benchmarks/login_storm.py --url http://localhost:8000/api --logins 200 --reads 500
+
+Single uvicorn process, 1 CPU, local Postgres 16, bcrypt ~330ms per verify,
+--logins 20 --reads 200:
+
+    concurrency 10       before            after
+    login p50 / p95      3010 / 3372ms     2825 / 3934ms
+    storm /me p50 / p95  37.4 / 60.0ms     16.2 / 26.2ms
+
+    concurrency 50
+    before: server stalls, requests hit the 60s client timeout
+            (the async get_current_user ran its DB lookup on the event loop, which blocked
+            whenever the connection pool was exhausted)
+    after:  login p50 4684ms, storm /me p50 301ms / p95 897ms, all 220 requests in 7.0s
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+import httpx
+
+async def timed(coro):
+    start = time.perf_counter()
+    response = await coro
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+def report(label: str, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if samples else 0.0
+    print(f"{label:<12} n={len(samples):<5} p50={statistics.median(samples):8.1f}ms p95={p95:8.1f}ms max={samples[-1]:8.1f}ms")
+
+async def main(url: str, logins: int, reads: int, concurrency: int):
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    password = "bench-password"
+
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        r = await client.post("/auth/register", json={"email": email, "password": password})
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        form = {"username": email, "password": password}
+
+        # Idle baseline
+        baseline = [await timed(client.get("/auth/me", headers=headers)) for _ in range(20)]
+
+        limit = asyncio.Semaphore(concurrency)
+
+        async def limited(coro_fn):
+            async with limit:
+                return await timed(coro_fn())
+
+        login_tasks = [limited(lambda: client.post("/auth/login", data=form)) for _ in range(logins)]
+        read_tasks = [limited(lambda: client.get("/auth/me", headers=headers)) for _ in range(reads)]
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*login_tasks, *read_tasks)
+        elapsed = time.perf_counter() - start
+
+    report("idle /me", baseline)
+    report("login", results[:logins])
+    report("storm /me", results[logins:])
+    print(f"total {elapsed:.2f}s, {(logins + reads) / elapsed:.0f} req/s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000/api")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.logins, args.reads, args.concurrency))
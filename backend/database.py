@@ -1,3 +1,6 @@
+import threading
+import time
+from collections import OrderedDict
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -5,9 +8,65 @@ from .config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+ENGINE_OPTIONS = {
+    "pool_size": settings.DATABASE_POOL_SIZE,
+    "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+    "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+    "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+    "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    "query_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+}
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **ENGINE_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read replica for GET traffic, falls back to the primary when not configured
+if settings.DATABASE_READ_URL:
+    read_engine = create_engine(settings.DATABASE_READ_URL, **ENGINE_OPTIONS)
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+def has_read_replica() -> bool:
+    return read_engine is not engine
+
+# Read-your-writes: user id -> monotonic time of their last write, oldest first.
+# Kept per process, like the principal cache.
+_last_write = OrderedDict()
+_last_write_lock = threading.Lock()
+
+def mark_write(user_id) -> None:
+    """
+    Record that the user just wrote, so their reads go to the primary until the replica catches up.
+    """
+    if not has_read_replica():
+        return
+    now = time.monotonic()
+    key = str(user_id)
+    with _last_write_lock:
+        _last_write[key] = now
+        _last_write.move_to_end(key)
+        # Entries are in write order, drop the expired ones from the front
+        while _last_write:
+            oldest_key, oldest = next(iter(_last_write.items()))
+            if now - oldest < settings.DATABASE_READ_YOUR_WRITES_SECONDS:
+                break
+            del _last_write[oldest_key]
+
+def recently_wrote(user_id) -> bool:
+    with _last_write_lock:
+        written = _last_write.get(str(user_id))
+    return written is not None and time.monotonic() - written < settings.DATABASE_READ_YOUR_WRITES_SECONDS
+
+def read_session(user_id):
+    """
+    Session for a user's read: the replica, or the primary if the user wrote within the window.
+    A stale list never 404s, so routing has to be decided up front rather than on a miss.
+    """
+    if recently_wrote(user_id):
+        return SessionLocal()
+    return ReadSessionLocal()
+
 Base = declarative_base()
 
 def get_db():
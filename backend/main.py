@@ -1,7 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .database import engine, Base
-from .routers import auth, portfolios, holdings, analyses
+from .routers import auth, portfolios, holdings, analyses, exports, dashboard
 from .config import settings
 
 # Create tables
@@ -27,6 +27,8 @@ app.include_router(auth.router, prefix="/api")
 app.include_router(portfolios.router, prefix="/api")
 app.include_router(holdings.router, prefix="/api")
 app.include_router(analyses.router, prefix="/api")
+app.include_router(exports.router, prefix="/api")
+app.include_router(dashboard.router, prefix="/api")
 
 @app.get("/")
 def read_root():
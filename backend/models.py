@@ -69,6 +69,11 @@ class Analysis(Base):
     sharpe_ratio = Column(Float)
     max_drawdown = Column(Float)
     volatility = Column(Float)
+    var_95 = Column(Float)   # 1-day Monte Carlo VaR, % of portfolio value
+    cvar_95 = Column(Float)
+    var_99 = Column(Float)
+    cvar_99 = Column(Float)
+    stress_test = Column(JSONB)  # Historical scenario P&L
     
     ai_summary = Column(Text)
     ai_recommendations = Column(JSONB)
@@ -79,3 +84,22 @@ class Analysis(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     portfolio = relationship("Portfolio", back_populates="analyses")
+
+class UserSummary(Base):
+    """
+    Per-user dashboard totals, refreshed whenever holdings or prices change
+    so the dashboard reads a single row instead of every portfolio.
+    """
+    __tablename__ = "user_summaries"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    portfolio_count = Column(Integer, default=0)
+    holding_count = Column(Integer, default=0)
+    total_value = Column(Float, default=0.0)
+    total_cost = Column(Float, default=0.0)
+    profit_loss = Column(Float, default=0.0)
+    profit_rate = Column(Float, default=0.0)
+    sector_distribution = Column(JSONB)
+    risk_score = Column(Integer)  # From the latest completed analysis
+    risk_level = Column(String(50))
+    updated_at = Column(DateTime, default=datetime.utcnow)
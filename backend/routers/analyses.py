@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
 from .. import models, database
-from ..analyzers import risk_calculator, sector_analyzer, ai_analyzer
-from ..services import stock_data
-from .auth import get_current_user
+from ..analyzers.portfolio_frame import PortfolioFrame, load_frame
+from ..analyzers import risk_calculator, sector_analyzer, ai_analyzer, monte_carlo, stress_test, rebalancer
+from ..services import stock_data, dashboard
+from .auth import get_current_user, get_user_read_db
 import uuid
+import numpy as np
 
 router = APIRouter(
     prefix="/portfolios/{portfolio_id}/analyze",
@@ -18,6 +20,23 @@ def get_db():
     finally:
         db.close()
 
+def revalue_holdings(db: Session, frame: PortfolioFrame):
+    """
+    Fetch current prices into the frame and write them back with one bulk UPDATE.
+    Same derived columns as stock_data.update_holding_calculations.
+    """
+    frame.price = np.array(
+        [stock_data.get_current_price(t, m) for t, m in zip(frame.ticker, frame.market)], dtype=float
+    )
+    value = frame.market_value
+    cost = frame.cost
+    profit = value - cost
+    rate = np.divide(profit, cost, out=np.zeros_like(profit), where=(frame.avg_price > 0) & (cost > 0)) * 100
+    db.bulk_update_mappings(models.Holding, [
+        {"id": i, "current_price": float(p), "market_value": float(v), "profit_loss": float(pl), "profit_rate": float(r)}
+        for i, p, v, pl, r in zip(frame.id, frame.price, value, profit, rate)
+    ])
+
 def run_analysis_task(analysis_id: uuid.UUID, portfolio_id: uuid.UUID):
     db = database.SessionLocal()
     try:
@@ -32,26 +51,29 @@ def run_analysis_task(analysis_id: uuid.UUID, portfolio_id: uuid.UUID):
             db.commit()
             return
             
-        holdings = portfolio.holdings
-        
         # 1. Update Prices
-        for h in holdings:
-            price = stock_data.get_current_price(h.ticker, h.market)
-            stock_data.update_holding_calculations(h, price)
+        # Analyzers work on column arrays, no Holding objects are loaded
+        frame = load_frame(db, portfolio_id)
+        revalue_holdings(db, frame)
         
         # Recalculate portfolio total logic here if needed, or rely on previous
-        total_val = sum(h.market_value for h in holdings)
+        total_val = float(frame.market_value.sum())
         portfolio.total_value = total_val
         db.commit()
 
         # 2. Risk Analysis
-        risk_metrics = risk_calculator.calculate_risk_metrics(holdings)
+        risk_metrics = risk_calculator.calculate_risk_metrics(frame)
+        tail_risk = monte_carlo.calculate_tail_risk(frame)
+        stress_results = stress_test.run_stress_tests(frame)
         
         # 3. Sector Analysis
-        sector_analysis = sector_analyzer.analyze_sector_distribution(holdings)
+        # KR holdings are priced in KRW, US holdings in USD
+        fx = stock_data.get_fx_rates()
+        sector_analysis = sector_analyzer.analyze_sector_distribution(frame, fx)
+        rebalance_plan = rebalancer.build_rebalance_plan(frame, sector_analysis, fx=fx)
         
         # 4. AI Analysis
-        ai_result = ai_analyzer.ai_analyze_portfolio(portfolio, risk_metrics, sector_analysis)
+        ai_result = ai_analyzer.ai_analyze_portfolio(portfolio, frame, {**risk_metrics, **tail_risk}, sector_analysis, rebalance_plan)
         
         # 5. Save Results
         analysis.risk_score = risk_metrics['risk_score']
@@ -60,19 +82,35 @@ def run_analysis_task(analysis_id: uuid.UUID, portfolio_id: uuid.UUID):
         analysis.sharpe_ratio = risk_metrics['sharpe_ratio']
         analysis.volatility = risk_metrics['volatility']
         analysis.max_drawdown = risk_metrics['max_drawdown']
+        analysis.var_95 = tail_risk['var_95']
+        analysis.cvar_95 = tail_risk['cvar_95']
+        analysis.var_99 = tail_risk['var_99']
+        analysis.cvar_99 = tail_risk['cvar_99']
+        analysis.stress_test = stress_results
         
         analysis.ai_summary = ai_result.get('summary')
         analysis.ai_recommendations = ai_result
         analysis.sector_distribution = sector_analysis
+        analysis.optimization_result = rebalance_plan
         
         analysis.status = "completed"
         db.commit()
+        # Polling clients should see the final status, not the replica's "processing"
+        database.mark_write(analysis.user_id)
+        # Prices and risk level changed, keep the dashboard row in sync
+        try:
+            dashboard.refresh_user_summary(db, portfolio.user_id)
+            db.commit()
+        except Exception as e:
+            print(f"Dashboard summary refresh failed: {e}")
+            db.rollback()
         
     except Exception as e:
         print(f"Analysis failed: {e}")
         analysis.status = "failed"
         analysis.error_message = str(e)
         db.commit()
+        database.mark_write(analysis.user_id)
     finally:
         db.close()
 
@@ -100,6 +138,7 @@ def start_analysis(
     db.add(analysis)
     db.commit()
     db.refresh(analysis)
+    database.mark_write(current_user.id)
     
     background_tasks.add_task(run_analysis_task, analysis.id, portfolio_id)
     
@@ -108,7 +147,7 @@ def start_analysis(
 @router.get("/{analysis_id}") # Note: this path is slightly different from standard REST structure if nested, but useful
 def get_analysis(
     analysis_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_user_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     analysis = db.query(models.Analysis).filter(
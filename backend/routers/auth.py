@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from .. import models, schemas, auth, database
+from starlette.concurrency import run_in_threadpool
 from jose import JWTError, jwt
 from ..config import settings
 
@@ -15,13 +16,10 @@ def get_db():
     finally:
         db.close()
 
-@router.post("/register", response_model=schemas.Token)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    hashed_password = auth.get_password_hash(user.password)
+def find_user_by_email(db: Session, email: str):
+    return db.query(models.User).filter(models.User.email == email).first()
+
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: str):
     db_user = models.User(
         email=user.email,
         password_hash=hashed_password,
@@ -30,21 +28,49 @@ def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    return db_user
+
+def principal(user: models.User) -> models.User:
+    """
+    Detached copy of the user without the password hash, safe to keep in the principal cache.
+    """
+    return models.User(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        investment_goal=user.investment_goal,
+        risk_tolerance=user.risk_tolerance,
+        created_at=user.created_at
+    )
+
+def issue_token(user: models.User) -> str:
+    # uid lets get_current_user resolve the principal from cache without a DB lookup
+    return auth.create_access_token(data={"sub": user.email, "uid": str(user.id)})
+
+# DB work runs in the threadpool, bcrypt in its own capped executor, so the event loop never blocks
+@router.post("/register", response_model=schemas.Token)
+async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(find_user_by_email, db, user.email)
+    if db_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
     
-    access_token = auth.create_access_token(data={"sub": db_user.email})
+    hashed_password = await auth.get_password_hash_async(user.password)
+    db_user = await run_in_threadpool(create_user, db, user, hashed_password)
+    
+    access_token = issue_token(db_user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not auth.verify_password(form_data.password, user.password_hash):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(find_user_by_email, db, form_data.username)
+    if not user or not await auth.verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = auth.create_access_token(data={"sub": user.email})
+    access_token = issue_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
@@ -58,15 +84,32 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-        token_data = schemas.TokenData(email=email)
+        token_data = schemas.TokenData(email=email, user_id=payload.get("uid"))
     except JWTError:
         raise credentials_exception
+
+    if token_data.user_id:
+        cached = auth.principal_cache.get(token_data.user_id)
+        if cached is not None:
+            return cached
         
-    user = db.query(models.User).filter(models.User.email == token_data.email).first()
+    user = await run_in_threadpool(find_user_by_email, db, token_data.email)
     if user is None:
         raise credentials_exception
+    user = principal(user)
+    auth.principal_cache.put(str(user.id), user)
     return user
 
+def get_user_read_db(current_user: models.User = Depends(get_current_user)):
+    """
+    Read session for the current user, on the primary right after they wrote.
+    """
+    db = database.read_session(current_user.id)
+    try:
+        yield db
+    finally:
+        db.close()
+
 @router.get("/me", response_model=schemas.User)
 def read_users_me(current_user: models.User = Depends(get_current_user)):
     return current_user
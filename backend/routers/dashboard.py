@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from .. import models, schemas, database
+from ..services import dashboard
+from .auth import get_current_user, get_user_read_db
+
+router = APIRouter(
+    prefix="/dashboard",
+    tags=["dashboard"]
+)
+
+def get_db():
+    db = database.SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.get("/summary", response_model=schemas.DashboardSummary)
+def read_summary(
+    db: Session = Depends(get_user_read_db),
+    primary_db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    # Primary key lookup, one row
+    summary = db.query(models.UserSummary).filter(models.UserSummary.user_id == current_user.id).first()
+    if summary is None:
+        # Users from before the summary table existed
+        dashboard.refresh_user_summary(primary_db, current_user.id)
+        primary_db.commit()
+        summary = primary_db.query(models.UserSummary).filter(models.UserSummary.user_id == current_user.id).first()
+    return summary
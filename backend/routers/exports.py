@@ -0,0 +1,225 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Float, Integer, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from .. import models, database
+from .auth import get_current_user
+import csv
+import io
+import json
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+router = APIRouter(
+    prefix="/export",
+    tags=["export"]
+)
+
+# Rows fetched per server-side cursor round trip and written per output chunk
+EXPORT_CHUNK_ROWS = 1000
+
+EXPORT_COLUMNS = {
+    "portfolios": [
+        models.Portfolio.id,
+        models.Portfolio.name,
+        models.Portfolio.description,
+        models.Portfolio.total_value,
+        models.Portfolio.total_cost,
+        models.Portfolio.profit_loss,
+        models.Portfolio.profit_rate,
+        models.Portfolio.created_at,
+    ],
+    "holdings": [
+        models.Holding.id,
+        models.Holding.portfolio_id,
+        models.Holding.ticker,
+        models.Holding.name,
+        models.Holding.market,
+        models.Holding.sector,
+        models.Holding.quantity,
+        models.Holding.avg_price,
+        models.Holding.current_price,
+        models.Holding.market_value,
+        models.Holding.profit_loss,
+        models.Holding.profit_rate,
+        models.Holding.weight,
+        models.Holding.created_at,
+    ],
+    "analyses": [
+        models.Analysis.id,
+        models.Analysis.portfolio_id,
+        models.Analysis.status,
+        models.Analysis.risk_score,
+        models.Analysis.risk_level,
+        models.Analysis.beta,
+        models.Analysis.sharpe_ratio,
+        models.Analysis.max_drawdown,
+        models.Analysis.volatility,
+        models.Analysis.var_95,
+        models.Analysis.cvar_95,
+        models.Analysis.var_99,
+        models.Analysis.cvar_99,
+        models.Analysis.ai_summary,
+        models.Analysis.sector_distribution,
+        models.Analysis.stress_test,
+        models.Analysis.optimization_result,
+        models.Analysis.created_at,
+    ],
+}
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def _export_query(db, resource: str, user_id):
+    columns = EXPORT_COLUMNS[resource]
+    query = db.query(*columns)
+    if resource == "portfolios":
+        query = query.filter(models.Portfolio.user_id == user_id).order_by(models.Portfolio.created_at)
+    elif resource == "holdings":
+        query = query.join(models.Portfolio, models.Holding.portfolio_id == models.Portfolio.id).filter(
+            models.Portfolio.user_id == user_id
+        ).order_by(models.Holding.portfolio_id, models.Holding.created_at)
+    else:
+        query = query.filter(models.Analysis.user_id == user_id).order_by(models.Analysis.created_at)
+    # Server-side cursor, only one chunk of rows is in memory at a time
+    return query.yield_per(EXPORT_CHUNK_ROWS)
+
+def _stream_rows(resource: str, user_id):
+    """
+    Yield lists of row tuples. Opens its own session because the response body
+    is produced after the request's dependencies have been torn down.
+    """
+    db = database.read_session(user_id)
+    try:
+        chunk = []
+        for row in _export_query(db, resource, user_id):
+            chunk.append(tuple(row))
+            if len(chunk) >= EXPORT_CHUNK_ROWS:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        db.close()
+
+def _is_json(column) -> bool:
+    return isinstance(column.type, JSONB)
+
+def _flat_value(column, value):
+    """
+    Scalar value for CSV / Parquet: JSON columns become JSON strings, UUIDs become strings.
+    """
+    if value is None:
+        return None
+    if _is_json(column):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (int, float, str)) or isinstance(column.type, DateTime):
+        return value
+    return str(value)
+
+def _csv_chunks(resource: str, user_id):
+    columns = EXPORT_COLUMNS[resource]
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow([c.key for c in columns])
+    for chunk in _stream_rows(resource, user_id):
+        for row in chunk:
+            writer.writerow([_flat_value(c, v) for c, v in zip(columns, row)])
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate(0)
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+def _ndjson_chunks(resource: str, user_id):
+    keys = [c.key for c in EXPORT_COLUMNS[resource]]
+    for chunk in _stream_rows(resource, user_id):
+        lines = [json.dumps(dict(zip(keys, row)), ensure_ascii=False, default=str) for row in chunk]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+def _arrow_type(column):
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file object that hands out what has been written since the last drain.
+    """
+    def __init__(self):
+        self._parts = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._parts.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+def _parquet_chunks(resource: str, user_id):
+    columns = EXPORT_COLUMNS[resource]
+    schema = pa.schema([(c.key, _arrow_type(c)) for c in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        # One row group per chunk
+        for chunk in _stream_rows(resource, user_id):
+            arrays = [
+                pa.array([_flat_value(c, row[i]) for row in chunk], type=schema.field(i).type)
+                for i, c in enumerate(columns)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+@router.get("/{resource}")
+def export_resource(
+    resource: str,
+    format: str = "csv",
+    current_user: models.User = Depends(get_current_user)
+):
+    if resource not in EXPORT_COLUMNS:
+        raise HTTPException(status_code=404, detail="Unknown export resource")
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Format must be one of csv, ndjson, parquet")
+    if format == "parquet" and pa is None:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+
+    if format == "csv":
+        body = _csv_chunks(resource, current_user.id)
+    elif format == "ndjson":
+        body = _ndjson_chunks(resource, current_user.id)
+    else:
+        body = _parquet_chunks(resource, current_user.id)
+
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{resource}.{format}"'}
+    )
@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from .. import models, schemas, database
-from ..services import stock_data
-from .auth import get_current_user
+from ..services import stock_data, dashboard
+from ..analyzers.portfolio_frame import load_frame
+from .auth import get_current_user, get_user_read_db
 import uuid
 
 router = APIRouter(
@@ -52,19 +53,22 @@ def create_holding(
     stock_data.update_holding_calculations(db_holding, current_price)
     
     db.add(db_holding)
-    db.commit()
-    db.refresh(db_holding)
+    db.flush()
     
     # Recalculate Portfolio Totals
     # Ideally should be a separate service or trigger, but inline for MVP
+    # Same transaction as the insert: a failed refresh saves nothing, so a retry can't duplicate the holding
     update_portfolio_totals(portfolio, db)
+    db.commit()
+    db.refresh(db_holding)
+    database.mark_write(portfolio.user_id)
     
     return db_holding
 
 @router.get("/", response_model=List[schemas.Holding])
 def read_holdings(
     portfolio_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_user_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     verify_portfolio_owner(portfolio_id, current_user.id, db)
@@ -72,10 +76,14 @@ def read_holdings(
     return holdings
 
 def update_portfolio_totals(portfolio: models.Portfolio, db: Session):
-    holdings = db.query(models.Holding).filter(models.Holding.portfolio_id == portfolio.id).all()
+    """
+    Recompute totals, weights and the user's dashboard row from the flushed holdings.
+    Leaves the commit to the caller.
+    """
+    frame = load_frame(db, portfolio.id)
     
-    total_val = sum(h.market_value for h in holdings)
-    total_cost = sum(h.avg_price * h.quantity for h in holdings)
+    total_val = float(frame.market_value.sum())
+    total_cost = float(frame.cost.sum())
     
     portfolio.total_value = total_val
     portfolio.total_cost = total_cost
@@ -87,7 +95,10 @@ def update_portfolio_totals(portfolio: models.Portfolio, db: Session):
         
     # Update weights
     if total_val > 0:
-        for h in holdings:
-            h.weight = (h.market_value / total_val) * 100
+        db.bulk_update_mappings(models.Holding, [
+            {"id": holding_id, "weight": float(weight)}
+            for holding_id, weight in zip(frame.id, frame.weight)
+        ])
     
-    db.commit()
+    db.flush()
+    dashboard.refresh_user_summary(db, portfolio.user_id)
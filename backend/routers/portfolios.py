@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from .. import models, schemas, database
-from .auth import get_current_user
+from ..analyzers import backtest
+from ..analyzers.portfolio_frame import load_frame
+from ..services import dashboard
+from .auth import get_current_user, get_user_read_db
 import uuid
 
 router = APIRouter(
@@ -29,15 +32,19 @@ def create_portfolio(
         user_id=current_user.id
     )
     db.add(db_portfolio)
+    db.flush()
+    # Same transaction: if the summary fails nothing is saved and a retry is safe
+    dashboard.refresh_user_summary(db, current_user.id)
     db.commit()
     db.refresh(db_portfolio)
+    database.mark_write(current_user.id)
     return db_portfolio
 
 @router.get("/", response_model=List[schemas.Portfolio])
 def read_portfolios(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_user_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     portfolios = db.query(models.Portfolio).filter(
@@ -45,20 +52,42 @@ def read_portfolios(
     ).offset(skip).limit(limit).all()
     return portfolios
 
+def find_portfolio(portfolio_id: uuid.UUID, user_id: uuid.UUID, db: Session):
+    return db.query(models.Portfolio).filter(
+        models.Portfolio.id == portfolio_id,
+        models.Portfolio.user_id == user_id
+    ).first()
+
 @router.get("/{portfolio_id}", response_model=schemas.Portfolio)
 def read_portfolio(
     portfolio_id: uuid.UUID, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_user_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    portfolio = db.query(models.Portfolio).filter(
-        models.Portfolio.id == portfolio_id,
-        models.Portfolio.user_id == current_user.id
-    ).first()
+    portfolio = find_portfolio(portfolio_id, current_user.id, db)
     if portfolio is None:
         raise HTTPException(status_code=404, detail="Portfolio not found")
     return portfolio
 
+@router.get("/{portfolio_id}/backtest")
+def backtest_portfolio(
+    portfolio_id: uuid.UUID,
+    years: int = 1,
+    rebalance: Optional[str] = None,
+    db: Session = Depends(get_user_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    if years not in (1, 3, 5):
+        raise HTTPException(status_code=400, detail="years must be 1, 3 or 5")
+    if rebalance is not None and rebalance not in backtest.REBALANCE_PERIODS:
+        raise HTTPException(status_code=400, detail="rebalance must be monthly, quarterly or yearly")
+
+    if find_portfolio(portfolio_id, current_user.id, db) is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+
+    frame = load_frame(db, portfolio_id)
+    return backtest.backtest_portfolio(frame, years=years, rebalance=rebalance)
+
 @router.delete("/{portfolio_id}")
 def delete_portfolio(
     portfolio_id: uuid.UUID, 
@@ -73,5 +102,8 @@ def delete_portfolio(
         raise HTTPException(status_code=404, detail="Portfolio not found")
     
     db.delete(portfolio)
+    db.flush()
+    dashboard.refresh_user_summary(db, current_user.id)
     db.commit()
+    database.mark_write(current_user.id)
     return {"ok": True}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from uuid import UUID
 
@@ -25,6 +25,7 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: Optional[str] = None
+    user_id: Optional[str] = None
 
 # Holding Schemas
 class HoldingBase(BaseModel):
@@ -66,6 +67,22 @@ class Portfolio(PortfolioBase):
     class Config:
         from_attributes = True
 
+# Dashboard Schema
+class DashboardSummary(BaseModel):
+    portfolio_count: int
+    holding_count: int
+    total_value: float
+    total_cost: float
+    profit_loss: float
+    profit_rate: float
+    sector_distribution: Dict[str, float] = {}
+    risk_score: Optional[int] = None
+    risk_level: Optional[str] = None
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
 # Analysis Schema
 class VideoAnalysisCreate(BaseModel):
     pass # Analysis creation trigger usually doesn't need body, just portfolio ID path param
@@ -0,0 +1,51 @@
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from .. import models
+from ..analyzers.portfolio_frame import PortfolioFrame, HOLDING_COLUMNS
+from ..analyzers.sector_analyzer import analyze_sector_distribution
+
+def refresh_user_summary(db: Session, user_id):
+    """
+    Recompute one user's dashboard row and upsert it, inside the caller's transaction.
+    Called from every path that changes holdings, prices or analyses of the user, after the
+    change is flushed and before it is committed, so the row can't disagree with a committed write.
+    A full per-user recompute is one indexed join over that user's holdings; deltas would need
+    per-sector values stored and would drift whenever prices are revalued.
+    """
+    # Serialize refreshes per user until commit: a refresh that read an older snapshot
+    # can't upsert after one that saw the newer write
+    db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(str(user_id), 0))))
+
+    rows = db.query(*HOLDING_COLUMNS).join(
+        models.Portfolio, models.Holding.portfolio_id == models.Portfolio.id
+    ).filter(models.Portfolio.user_id == user_id).all()
+    frame = PortfolioFrame.from_rows(rows)
+
+    portfolio_count = db.query(func.count(models.Portfolio.id)).filter(
+        models.Portfolio.user_id == user_id
+    ).scalar()
+    latest = db.query(models.Analysis.risk_score, models.Analysis.risk_level).filter(
+        models.Analysis.user_id == user_id,
+        models.Analysis.status == "completed"
+    ).order_by(models.Analysis.created_at.desc()).first()
+
+    total_value = float(frame.market_value.sum())
+    total_cost = float(frame.cost.sum())
+    values = {
+        "portfolio_count": portfolio_count,
+        "holding_count": len(frame),
+        "total_value": total_value,
+        "total_cost": total_cost,
+        "profit_loss": total_value - total_cost,
+        "profit_rate": (total_value - total_cost) / total_cost * 100 if total_cost > 0 else 0.0,
+        "sector_distribution": analyze_sector_distribution(frame)['current'],
+        "risk_score": latest.risk_score if latest else None,
+        "risk_level": latest.risk_level if latest else None,
+        "updated_at": datetime.utcnow(),
+    }
+
+    stmt = insert(models.UserSummary).values(user_id=user_id, **values)
+    stmt = stmt.on_conflict_do_update(index_elements=[models.UserSummary.user_id], set_=values)
+    db.execute(stmt)
@@ -1,7 +1,11 @@
 import yfinance as yf
 from pykrx import stock
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import List, Dict, Tuple
+import os
+import tempfile
 import pandas as pd
+from ..config import settings
 
 def get_current_price(ticker: str, market: str) -> float:
     """
@@ -50,6 +54,20 @@ def get_current_price(ticker: str, market: str) -> float:
         print(f"Error fetching price for {ticker}: {e}")
         return 0.0
 
+def get_fx_rates() -> Dict[str, float]:
+    """
+    KRW per unit of each market's trading currency, for comparing KR and US holdings.
+    Falls back to the configured USD/KRW rate.
+    """
+    rates = {"KR": 1.0, "US": settings.FX_USD_KRW}
+    try:
+        data = yf.Ticker("KRW=X").history(period="5d")
+        if not data.empty:
+            rates["US"] = float(data['Close'].iloc[-1])
+    except Exception as e:
+        print(f"Error fetching USD/KRW rate: {e}")
+    return rates
+
 def update_holding_calculations(holding, current_price: float):
     """
     Update holding calculation fields based on current price.
@@ -62,3 +80,106 @@ def update_holding_calculations(holding, current_price: float):
     else:
         holding.profit_rate = 0.0
     return holding
+
+def _price_cache_path(ticker: str, market: str) -> str:
+    return os.path.join(settings.PRICE_CACHE_DIR, f"{market}_{ticker}.pkl")
+
+def _load_cached_history(ticker: str, market: str):
+    path = _price_cache_path(ticker, market)
+    if not os.path.exists(path):
+        return None, None
+    try:
+        modified = datetime.fromtimestamp(os.path.getmtime(path)).date()
+        return pd.read_pickle(path), modified
+    except Exception as e:
+        # Corrupt or written by an incompatible pandas, treat as a miss and refetch
+        print(f"Ignoring unreadable price cache {path}: {e}")
+        return None, None
+
+def _save_cached_history(ticker: str, market: str, series: pd.Series):
+    os.makedirs(settings.PRICE_CACHE_DIR, exist_ok=True)
+    # Write to a temp file next to the entry and rename, so readers never see a partial pickle
+    fd, tmp_path = tempfile.mkstemp(dir=settings.PRICE_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            series.to_pickle(f)
+        os.replace(tmp_path, _price_cache_path(ticker, market))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def _store_history(ticker: str, market: str, history: pd.Series, start: pd.Timestamp, series: Dict[str, pd.Series]):
+    history.attrs["fetched_from"] = start
+    series[ticker] = history
+    try:
+        _save_cached_history(ticker, market, history)
+    except Exception as e:
+        print(f"Error caching price history for {ticker}: {e}")
+
+def _fetch_kr_history(ticker: str, start: datetime, end: datetime) -> pd.Series:
+    df = stock.get_market_ohlcv_by_date(start.strftime("%Y%m%d"), end.strftime("%Y%m%d"), ticker)
+    if df.empty:
+        return pd.Series(dtype=float)
+    return df['종가'].astype(float)
+
+def _fetch_us_history(tickers: List[str], start: datetime, end: datetime) -> Dict[str, pd.Series]:
+    # One bulk request for every US ticker
+    data = yf.download(tickers, start=start, end=end + timedelta(days=1), auto_adjust=True, progress=False, group_by="column")
+    if data.empty:
+        return {}
+    close = data['Close']
+    if isinstance(close, pd.Series):
+        close = close.to_frame(tickers[0])
+    return {t: close[t].dropna() for t in tickers if t in close}
+
+def get_price_history(tickers: List[Tuple[str, str]], start: datetime, end: datetime) -> pd.DataFrame:
+    """
+    Daily close prices (dates x tickers) for (ticker, market) pairs.
+    Each ticker's history is cached on disk. A cache entry is reused when it was fetched
+    from `start` or earlier and either reaches `end` or was refreshed today.
+    """
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp(end).normalize()
+    today = datetime.now().date()
+
+    series, stale = {}, {}
+    missing_kr, missing_us = [], []
+    for ticker, market in tickers:
+        cached, modified = _load_cached_history(ticker, market)
+        if cached is not None:
+            fetched_from = cached.attrs.get("fetched_from", cached.index.min() if len(cached) else end)
+            if fetched_from <= start and ((len(cached) and cached.index.max() >= end) or modified == today):
+                series[ticker] = cached
+                continue
+            stale[ticker] = cached
+        if market == "KR":
+            missing_kr.append(ticker)
+        else:
+            missing_us.append(ticker)
+
+    # One failing ticker must not cost us the others
+    for ticker in missing_kr:
+        try:
+            history = _fetch_kr_history(ticker, start, end)
+        except Exception as e:
+            print(f"Error fetching price history for {ticker}: {e}")
+            continue
+        _store_history(ticker, "KR", history, start, series)
+
+    if missing_us:
+        try:
+            fetched = _fetch_us_history(missing_us, start, end)
+        except Exception as e:
+            print(f"Error fetching US price history: {e}")
+            fetched = None
+        if fetched is not None:
+            for ticker in missing_us:
+                _store_history(ticker, "US", fetched.get(ticker, pd.Series(dtype=float)), start, series)
+
+    # Fall back to whatever we had cached if the refresh failed
+    for ticker, cached in stale.items():
+        series.setdefault(ticker, cached)
+
+    frame = pd.DataFrame({t: s for t, s in series.items()})
+    frame.index = pd.to_datetime(frame.index)
+    return frame.sort_index().loc[start:end]
@@ -0,0 +1,28 @@
+import numpy as np
+from backend.analyzers.portfolio_frame import PortfolioFrame
+from backend.analyzers.monte_carlo import calculate_tail_risk_batch, empty_tail_metrics
+
+def _frame(tickers):
+    return PortfolioFrame.from_rows(
+        (i, t, t, 'KR' if t.isdigit() else 'US', None, 10.0, 1.0, 100.0 + i) for i, t in enumerate(tickers)
+    )
+
+PORTFOLIOS = [
+    _frame(['005930', '000660']),
+    _frame(['AAPL', 'MSFT', 'JPM', 'XOM']),
+    PortfolioFrame.empty(),
+    _frame(['105560', '055550', '207940']),
+    _frame(['NVDA']),
+]
+
+def test_pooled_batch_matches_serial():
+    # Child seeds are per portfolio, so scheduling across processes must not change results
+    serial = calculate_tail_risk_batch(PORTFOLIOS, n_paths=5000, max_workers=1)
+    pooled = calculate_tail_risk_batch(PORTFOLIOS, n_paths=5000, max_workers=2)
+    assert serial == pooled
+    assert serial[2] == empty_tail_metrics()
+
+def test_cvar_not_below_var():
+    for metrics in calculate_tail_risk_batch(PORTFOLIOS, n_paths=5000, max_workers=1):
+        assert metrics['cvar_95'] >= metrics['var_95']
+        assert metrics['cvar_99'] >= metrics['var_99'] >= metrics['var_95']
@@ -0,0 +1,45 @@
+import numpy as np
+from backend.analyzers.portfolio_frame import PortfolioFrame
+from backend.analyzers.rebalancer import build_rebalance_plan, compute_trades, rebalance_portfolios
+
+def _random_frame(rng, n):
+    rows = [
+        (i, f"T{i}", f"T{i}", 'US', None, float(rng.integers(1, 500)), 0.0, round(float(rng.uniform(1, 900)), 2))
+        for i in range(n)
+    ]
+    return PortfolioFrame.from_rows(rows)
+
+def test_no_issues_means_no_trades():
+    # Targets equal to the current weights must not produce orders from float round-off
+    rng = np.random.default_rng(0)
+    for _ in range(1000):
+        frame = _random_frame(rng, int(rng.integers(1, 15)))
+        plan = build_rebalance_plan(frame, {'issues': []})
+        assert plan['trades'] == []
+        assert abs(plan['cash_left']) < 1e-6
+
+def test_compute_trades_fills_leftover_cash():
+    new_qty, trades, cash_left, _ = compute_trades(
+        quantity=[[10, 0]], price=[[100.0, 50.0]], target_weight=[[0.5, 0.5]]
+    )
+    np.testing.assert_array_equal(new_qty, [[5, 10]])
+    np.testing.assert_array_equal(trades, [[-5, 10]])
+    assert cash_left[0] == 0.0
+
+def test_mixed_markets_are_sized_in_one_currency():
+    # 7,000,000 KRW of Samsung and 50 x $120 = 8,100,000 KRW at 1350 KRW/USD
+    frame = PortfolioFrame.from_rows([
+        (0, '005930', 'Samsung', 'KR', None, 100.0, 0.0, 70000.0),
+        (1, 'XYZ', 'XYZ', 'US', None, 50.0, 0.0, 120.0),
+    ])
+    fx = {'KR': 1.0, 'US': 1350.0}
+    plan = build_rebalance_plan(frame, {'issues': []}, fx=fx)
+    assert plan['trades'] == []
+
+    # Move to 50/50 of 15,100,000 KRW: 108 x 70,000 and 46 x $120, 88,000 KRW left over
+    plan = rebalance_portfolios([frame], [np.array([0.5, 0.5])], fx=fx)[0]
+    trades = {t['ticker']: t for t in plan['trades']}
+    assert (trades['005930']['action'], trades['005930']['quantity'], trades['005930']['currency']) == ('buy', 8, 'KRW')
+    assert (trades['XYZ']['action'], trades['XYZ']['quantity'], trades['XYZ']['currency']) == ('sell', 4, 'USD')
+    assert trades['XYZ']['amount'] == 480.0
+    assert abs(plan['cash_left'] - 88000) < 1e-6